@@ -10,6 +10,15 @@ COOKIE_BANNER_TIMEOUT = 3  # Timeout for cookie banner handling
 PAGE_NAVIGATION_TIMEOUT = 15  # Timeout for page navigation
 CONTACT_PAGE_SEARCH_TIMEOUT = 10  # Timeout for contact page search
 
+# Connection pool settings
+HTTP_POOL_LIMIT = 20  # Total simultaneous connections
+HTTP_POOL_LIMIT_PER_HOST = 4  # Simultaneous connections to a single host
+DNS_CACHE_TTL = 300  # Seconds to cache DNS lookups
+
+# Response size limit (in bytes) - contact details live well within this
+MAX_RESPONSE_BYTES = 512 * 1024
+PARSE_CACHE_SIZE = 64  # Parsed pages kept for reuse between crawling and extraction
+
 # Retry settings
 MAX_RETRIES = 2  # Reduced from 3
 RETRY_BACKOFF_FACTOR = 1  # Reduced from 2
@@ -18,6 +27,7 @@ RETRY_BACKOFF_FACTOR = 1  # Reduced from 2
 MAX_CONTACT_PAGES = 3  # Reduced from 5
 MAX_DEPTH = 2  # Reduced from 3
 MAX_PAGES_PER_DOMAIN = 10  # Reduced from 20
+CRAWL_CONCURRENCY = 5  # Pages fetched in parallel while crawling
 
 # User-Agent settings
 USER_AGENTS = [
@@ -31,9 +41,15 @@ USER_AGENTS = [
 HEADLESS = True
 BROWSER_TYPE = "chromium"  # Options: chromium, firefox, webkit
 SLOW_MO = 10  # Reduced from 50ms
+BROWSER_POOL_SIZE = 3  # Browser contexts used to load pages concurrently
+MAX_USES_PER_CONTEXT = 50  # Pages loaded before a context is replaced, to bound memory growth
+# Resource types never downloaded by the browser - they cannot contain emails.
+# Documents, scripts, XHR and fetch stay enabled since some emails are injected by JS.
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet", "websocket", "manifest"]
 
 # Output settings
 OUTPUT_FILE = "output.txt"
+VISITED_FILE = "visited_urls.bin"  # Fingerprints of websites already processed
 
 # Anti-bot settings
 COOKIES_ENABLED = True
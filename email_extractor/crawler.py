@@ -3,14 +3,22 @@ Crawler module for the Email Extractor.
 """
 
 import asyncio
-from urllib.parse import urlparse
+import sys
 import time
 
 from config import (
     MAX_CONTACT_PAGES, MAX_PAGES_PER_DOMAIN, GLOBAL_TIMEOUT,
-    CONTACT_PAGE_SEARCH_TIMEOUT
+    CONTACT_PAGE_SEARCH_TIMEOUT, CRAWL_CONCURRENCY
 )
-from utils import normalize_url, is_same_domain, logger
+from utils import (
+    normalize_url, canonicalize_url, is_same_domain, url_fingerprint,
+    urlparse, logger
+)
+
+if sys.version_info >= (3, 11):
+    from asyncio import timeout
+else:
+    from async_timeout import timeout
 
 class Crawler:
     """Handles the crawling logic for finding contact pages."""
@@ -27,15 +35,13 @@ class Crawler:
         self.playwright_handler = playwright_handler
         self.visited_urls = set()
         self.contact_pages = []
-        self.start_time = None
+        self._contact_seen = set()
+        self._sem = asyncio.Semaphore(CRAWL_CONCURRENCY)
+        self._deadline = None
     
     def _is_timeout_reached(self):
         """Check if the global timeout has been reached."""
-        if not self.start_time:
-            return False
-        
-        elapsed = time.time() - self.start_time
-        return elapsed >= GLOBAL_TIMEOUT
+        return self._deadline is not None and time.monotonic() >= self._deadline
     
     def _should_visit_url(self, url, base_url):
         """
@@ -48,8 +54,10 @@ class Crawler:
         Returns:
             bool: True if the URL should be visited, False otherwise
         """
+        url = canonicalize_url(url)
+        
         # Skip if already visited
-        if url in self.visited_urls:
+        if url_fingerprint(url) in self.visited_urls:
             return False
         
         # Skip if not the same domain
@@ -77,22 +85,22 @@ class Crawler:
             list: List of contact page URLs
         """
         try:
-            # Create a task with timeout
-            crawl_task = asyncio.create_task(self._find_contact_pages_impl(url))
-            try:
-                return await asyncio.wait_for(crawl_task, timeout=CONTACT_PAGE_SEARCH_TIMEOUT)
-            except asyncio.TimeoutError:
-                logger.warning(f"Contact page search timed out for {url}")
-                return []
+            # Install a deadline on the current task instead of spawning a child task
+            async with timeout(CONTACT_PAGE_SEARCH_TIMEOUT):
+                return await self._find_contact_pages_impl(url)
+        except asyncio.TimeoutError:
+            logger.warning(f"Contact page search timed out for {url}")
+            return []
         except Exception as e:
             logger.error(f"Error finding contact pages: {str(e)}")
             return []
 
     async def _find_contact_pages_impl(self, url):
         """Implementation of contact page finding with proper error handling."""
-        self.start_time = time.time()
+        self._deadline = time.monotonic() + GLOBAL_TIMEOUT
         self.visited_urls = set()
         self.contact_pages = []
+        self._contact_seen = set()
         
         # Start with the homepage
         await self._crawl_for_contact_pages(url, url)
@@ -102,53 +110,103 @@ class Crawler:
     
     async def _crawl_for_contact_pages(self, url, base_url):
         """
-        Recursively crawl for contact pages.
+        Crawl the homepage for contact pages, then fan out to the discovered pages.
         
         Args:
             url (str): The current URL to crawl
             base_url (str): The base URL of the website
         """
-        # Check if we should stop crawling
-        if self._is_timeout_reached() or len(self.contact_pages) >= MAX_CONTACT_PAGES:
-            return
+        url = canonicalize_url(url)
         
-        # Skip if we shouldn't visit this URL
+        # Skip if we shouldn't visit this URL (also covers the timeout)
         if not self._should_visit_url(url, base_url):
             return
         
         # Mark as visited
-        self.visited_urls.add(url)
+        self.visited_urls.add(url_fingerprint(url))
         
         # Try HTTP request first
-        html_text, soup = self.http_handler.fetch_url(url)
+        html_text, tree = await self.http_handler.fetch_url(url)
         
-        # If HTTP request failed and Playwright is available, try with Playwright
-        if (not html_text or not soup) and self.playwright_handler:
-            success, html_content, soup = await self.playwright_handler.navigate_to_url(url)
-            if not success or not soup:
-                return
-        
-        # If we still don't have a soup, return
-        if not soup:
-            return
-        
-        # Find contact pages from the current page
-        if self.playwright_handler and hasattr(self.playwright_handler, 'page'):
-            # Use Playwright if available
-            contact_urls = await self.playwright_handler.find_contact_pages(base_url)
+        if html_text and tree:
+            contact_urls = self.http_handler.find_contact_pages(url, tree)
+        elif self.playwright_handler:
+            # If HTTP request failed, try with Playwright
+            contact_urls = await self.playwright_handler.find_contact_pages(url)
         else:
-            # Fallback to HTTP handler
-            contact_urls = self.http_handler.find_contact_pages(base_url, soup)
+            return
         
         # Add contact pages to the list
-        for contact_url in contact_urls:
-            if contact_url not in self.contact_pages and len(self.contact_pages) < MAX_CONTACT_PAGES:
-                self.contact_pages.append(contact_url)
+        self._add_contact_pages(contact_urls, base_url)
         
-        # If we have enough contact pages, return
-        if len(self.contact_pages) >= MAX_CONTACT_PAGES:
+        # Stop if the homepage alone filled the list or we ran out of time
+        if len(self.contact_pages) >= MAX_CONTACT_PAGES or self._is_timeout_reached():
             return
         
-        # If we've reached the timeout, return
-        if self._is_timeout_reached():
-            return
\ No newline at end of file
+        # Visit the discovered pages concurrently to find further contact pages
+        candidates = []
+        for contact_url in contact_urls:
+            contact_url = canonicalize_url(contact_url)
+            if self._should_visit_url(contact_url, base_url):
+                self.visited_urls.add(url_fingerprint(contact_url))
+                candidates.append(contact_url)
+        
+        tasks = [asyncio.create_task(self._visit(c, base_url)) for c in candidates]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                await finished
+                if len(self.contact_pages) >= MAX_CONTACT_PAGES or self._is_timeout_reached():
+                    break
+        finally:
+            # Cancel whatever is still running once we have enough pages
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _visit(self, url, base_url):
+        """
+        Fetch a discovered page over HTTP and collect the contact pages it links to.
+        
+        Args:
+            url (str): The URL to visit
+            base_url (str): The base URL of the website
+        """
+        async with self._sem:
+            if self._is_timeout_reached() or len(self.contact_pages) >= MAX_CONTACT_PAGES:
+                return
+            
+            try:
+                html_text, tree = await self.http_handler.fetch_url(url)
+            except Exception as e:
+                logger.warning(f"Error visiting {url}: {str(e)}")
+                return
+            
+            if not html_text or not tree:
+                return
+            
+            # Relative links are resolved against the visited page, not the homepage
+            self._add_contact_pages(self.http_handler.find_contact_pages(url, tree), base_url)
+    
+    def _add_contact_pages(self, contact_urls, base_url):
+        """
+        Add newly discovered contact pages, skipping duplicates and other domains.
+        
+        Pages are deduplicated on host and path only, so variants such as
+        /contact and /contact?lang=en do not take up two of the
+        MAX_CONTACT_PAGES slots. The highest scored variant is kept.
+        
+        Args:
+            contact_urls (list): Contact page URLs sorted by relevance
+            base_url (str): The base URL of the website
+        """
+        for contact_url in contact_urls:
+            if len(self.contact_pages) >= MAX_CONTACT_PAGES:
+                break
+            contact_url = canonicalize_url(contact_url)
+            if not is_same_domain(contact_url, base_url):
+                continue
+            parsed = urlparse(contact_url)
+            fingerprint = url_fingerprint(parsed.netloc + parsed.path.rstrip('/'))
+            if fingerprint not in self._contact_seen:
+                self._contact_seen.add(fingerprint)
+                self.contact_pages.append(contact_url)
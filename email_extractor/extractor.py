@@ -12,7 +12,7 @@ from utils import logger, normalize_url, is_valid_url
 class EmailExtractor:
     """Handles the email extraction process."""
     
-    def __init__(self, http_handler, playwright_handler, crawler):
+    def __init__(self, http_handler, playwright_handler, crawler, processed_urls=None):
         """
         Initialize the email extractor.
         
@@ -20,20 +20,18 @@ class EmailExtractor:
             http_handler: The HTTP handler for making requests
             playwright_handler: The Playwright handler for JavaScript-heavy sites
             crawler: The crawler for finding contact pages
+            processed_urls: Optional FingerprintStore of URLs finished in earlier runs
         """
         self.http_handler = http_handler
         self.playwright_handler = playwright_handler
         self.crawler = crawler
-        self.start_time = None
+        self.processed_urls = processed_urls
+        self._deadline = None
         self.extracted_emails = set()
     
     def _is_timeout_reached(self):
         """Check if the global timeout has been reached."""
-        if not self.start_time:
-            return False
-        
-        elapsed = time.time() - self.start_time
-        return elapsed >= GLOBAL_TIMEOUT
+        return self._deadline is not None and time.monotonic() >= self._deadline
     
     def _normalize_input_url(self, url):
         """
@@ -67,7 +65,7 @@ class EmailExtractor:
         Returns:
             set: Set of extracted email addresses
         """
-        self.start_time = time.time()
+        self._deadline = time.monotonic() + GLOBAL_TIMEOUT
         self.extracted_emails = set()
         
         # Normalize the input URL
@@ -75,10 +73,54 @@ class EmailExtractor:
         if not normalized_url:
             return self.extracted_emails
         
+        # Skip websites that were fully processed in an earlier run
+        if self.processed_urls is not None and normalized_url in self.processed_urls:
+            logger.info(f"Skipping already processed URL: {normalized_url}")
+            return self.extracted_emails
+        
+        emails = await self._extract_emails(normalized_url)
+        
+        # Only remember websites that were actually reached, so ones that failed
+        # to load are tried again on the next run
+        if self.processed_urls is not None and self._is_processed(normalized_url):
+            self.processed_urls.add(normalized_url)
+        
+        return emails
+    
+    def _is_processed(self, normalized_url):
+        """
+        Check whether a website was processed successfully.
+        
+        Args:
+            normalized_url (str): The normalized URL of the website
+            
+        Returns:
+            bool: True if emails were found or the homepage loaded, False otherwise
+        """
+        if self.extracted_emails:
+            return True
+        
+        # Without emails, the site only counts if the search ran to the end
+        if self._is_timeout_reached():
+            return False
+        
+        return (self.http_handler.has_loaded(normalized_url)
+                or self.playwright_handler.has_loaded(normalized_url))
+    
+    async def _extract_emails(self, normalized_url):
+        """
+        Extract emails from a normalized URL, trying HTTP before Playwright.
+        
+        Args:
+            normalized_url (str): The normalized URL to extract emails from
+            
+        Returns:
+            set: Set of extracted email addresses
+        """
         logger.info(f"Starting email extraction for: {normalized_url}")
         
         # Step 1: Try to extract emails from the homepage using HTTP
-        homepage_emails = self.http_handler.extract_emails_from_page(normalized_url)
+        homepage_emails = await self.http_handler.extract_emails_from_page(normalized_url)
         self._add_emails(homepage_emails)
         
         # If we found emails, we're done - no need for Playwright
@@ -95,7 +137,7 @@ class EmailExtractor:
                 logger.warning("Global timeout reached, stopping extraction")
                 break
                 
-            contact_emails = self.http_handler.extract_emails_from_page(contact_url)
+            contact_emails = await self.http_handler.extract_emails_from_page(contact_url)
             self._add_emails(contact_emails)
             
             # If we found emails, we can stop - no need for Playwright
@@ -118,15 +160,11 @@ class EmailExtractor:
             
             # Step 5: If still no emails, try contact pages with Playwright
             logger.info("No emails found on homepage with Playwright, trying contact pages")
-            for contact_url in contact_pages:
-                if self._is_timeout_reached():
-                    logger.warning("Global timeout reached, stopping extraction")
-                    break
-                    
-                contact_emails_pw = await self.playwright_handler.extract_emails_from_page(contact_url)
-                self._add_emails(contact_emails_pw)
+            if contact_pages and not self._is_timeout_reached():
+                # Load the contact pages concurrently across the browser context pool
+                for contact_emails_pw in await self.playwright_handler.extract_emails_from_pages(contact_pages):
+                    self._add_emails(contact_emails_pw)
                 
-                # If we found emails, we can stop
                 if self.extracted_emails:
                     logger.info(f"Found {len(self.extracted_emails)} emails on contact pages using Playwright")
                     return self.extracted_emails
@@ -2,46 +2,55 @@
 HTTP request handler for the Email Extractor.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+from collections import OrderedDict
+import aiohttp
+from selectolax.parser import HTMLParser
 import logging
 import time
-from tenacity import retry, stop_after_attempt, wait_exponential
 from urllib.parse import urljoin
 
-from config import HTTP_TIMEOUT, MAX_RETRIES, RETRY_BACKOFF_FACTOR
+from config import (
+    HTTP_TIMEOUT, MAX_RETRIES, RETRY_BACKOFF_FACTOR, MAX_RESPONSE_BYTES,
+    PARSE_CACHE_SIZE
+)
 from utils import (
-    get_random_user_agent, extract_emails_from_text, 
-    normalize_url, is_likely_contact_page, decode_email_entities,
-    logger
+    get_random_user_agent, extract_emails_from_html,
+    canonicalize_url, rank_contact_links,
+    url_fingerprint, logger
 )
 
+# Static request headers, set once on the session
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0',
+}
+
 class HTTPHandler:
     """Handles HTTP requests and email extraction from HTML content."""
     
-    def __init__(self):
-        """Initialize the HTTP handler with a session."""
-        self.session = requests.Session()
+    def __init__(self, session):
+        """
+        Initialize the HTTP handler with a shared session.
+        
+        Args:
+            session (aiohttp.ClientSession): The pooled session used for all requests
+        """
+        self.session = session
+        self.session.headers.update(DEFAULT_HEADERS)
+        self._rotate_user_agent()
         self.visited_urls = set()
+        self.loaded_urls = set()
+        self._parse_cache = OrderedDict()
     
-    def _get_headers(self):
-        """Get request headers with a random user agent."""
-        return {
-            'User-Agent': get_random_user_agent(),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0',
-        }
+    def _rotate_user_agent(self):
+        """Switch the session to a new random user agent."""
+        self.session.headers['User-Agent'] = get_random_user_agent()
     
-    @retry(
-        stop=stop_after_attempt(MAX_RETRIES),
-        wait=wait_exponential(multiplier=RETRY_BACKOFF_FACTOR, min=1, max=10),
-        reraise=True
-    )
-    def fetch_url(self, url):
+    async def fetch_url(self, url):
         """
         Fetch a URL with retry logic.
         
@@ -49,26 +58,90 @@ class HTTPHandler:
             url (str): The URL to fetch
             
         Returns:
-            tuple: (response_text, soup) or (None, None) if failed
+            tuple: (response_text, tree) or (None, None) if failed
         """
-        if url in self.visited_urls:
+        fingerprint = url_fingerprint(canonicalize_url(url))
+        
+        # Share the parsed page between the crawler and the extractor
+        cached = self._parse_cache.get(fingerprint)
+        if cached:
+            self._parse_cache.move_to_end(fingerprint)
+            return cached
+        
+        if fingerprint in self.visited_urls:
             logger.debug(f"Skipping already visited URL: {url}")
             return None, None
         
-        self.visited_urls.add(url)
+        html_text, tree = await self._fetch_with_retries(url)
+        
+        # Only mark the URL once the fetch has finished, so a fetch cancelled by
+        # a crawl limit or timeout does not leave it visited without a cached page
+        self.visited_urls.add(fingerprint)
+        if html_text and tree:
+            self.loaded_urls.add(fingerprint)
+            self._parse_cache[fingerprint] = (html_text, tree)
+            if len(self._parse_cache) > PARSE_CACHE_SIZE:
+                self._parse_cache.popitem(last=False)
+        
+        return html_text, tree
+    
+    def has_loaded(self, url):
+        """
+        Check whether a URL was fetched successfully.
+        
+        Args:
+            url (str): The URL to check
+            
+        Returns:
+            bool: True if the page was fetched and parsed, False otherwise
+        """
+        return url_fingerprint(canonicalize_url(url)) in self.loaded_urls
+    
+    async def _fetch_with_retries(self, url):
+        """
+        Fetch a URL, retrying on network errors.
         
-        try:
-            logger.info(f"Fetching URL: {url}")
-            response = self.session.get(
-                url,
-                headers=self._get_headers(),
-                timeout=HTTP_TIMEOUT,
-                allow_redirects=True
-            )
+        Args:
+            url (str): The URL to fetch
             
+        Returns:
+            tuple: (response_text, tree) or (None, None) if failed
+        """
+        for attempt in range(MAX_RETRIES):
+            try:
+                return await self._fetch_once(url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Error fetching {url}: {str(e)}")
+                if attempt + 1 < MAX_RETRIES:
+                    # Back off exponentially and retry with a different user agent
+                    await asyncio.sleep(min(10, max(1, RETRY_BACKOFF_FACTOR * 2 ** attempt)))
+                    self._rotate_user_agent()
+            except Exception as e:
+                logger.error(f"Unexpected error fetching {url}: {str(e)}")
+                return None, None
+        
+        return None, None
+    
+    async def _fetch_once(self, url):
+        """
+        Make a single request for a URL and parse the response.
+        
+        Args:
+            url (str): The URL to fetch
+            
+        Returns:
+            tuple: (response_text, tree) or (None, None) if the response is unusable
+        """
+        logger.info(f"Fetching URL: {url}")
+        async with self.session.get(
+            url,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            allow_redirects=True
+        ) as response:
             # Check if the request was successful
-            if response.status_code != 200:
-                logger.warning(f"Failed to fetch {url}, status code: {response.status_code}")
+            if response.status != 200:
+                logger.warning(f"Failed to fetch {url}, status code: {response.status}")
+                self._rotate_user_agent()
                 return None, None
             
             # Check content type
@@ -77,18 +150,26 @@ class HTTPHandler:
                 logger.warning(f"Skipping non-HTML content: {content_type} for {url}")
                 return None, None
             
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'lxml')
-            return response.text, soup
+            # Read at most MAX_RESPONSE_BYTES; the rest is never downloaded
+            if response.content_length and response.content_length > MAX_RESPONSE_BYTES:
+                logger.debug(f"Truncating {url} from {response.content_length} to {MAX_RESPONSE_BYTES} bytes")
             
-        except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {str(e)}")
-            raise  # Let retry handle this
-        except Exception as e:
-            logger.error(f"Unexpected error fetching {url}: {str(e)}")
-            return None, None
+            chunks = []
+            total = 0
+            async for chunk in response.content.iter_chunked(65536):
+                chunks.append(chunk)
+                total += len(chunk)
+                if total >= MAX_RESPONSE_BYTES:
+                    break
+            
+            body = b''.join(chunks)[:MAX_RESPONSE_BYTES]
+            html_text = body.decode(response.charset or 'utf-8', errors='replace')
+        
+        # Parse the HTML
+        tree = HTMLParser(html_text)
+        return html_text, tree
     
-    def extract_emails_from_page(self, url):
+    async def extract_emails_from_page(self, url):
         """
         Extract emails from a web page.
         
@@ -98,91 +179,32 @@ class HTTPHandler:
         Returns:
             list: List of extracted email addresses
         """
-        html_text, soup = self.fetch_url(url)
-        if not html_text or not soup:
+        html_text, tree = await self.fetch_url(url)
+        if not html_text or not tree:
             return []
         
-        emails = []
-        
-        # Method 1: Extract from raw HTML (catches obfuscated emails)
-        decoded_html = decode_email_entities(html_text)
-        raw_emails = extract_emails_from_text(decoded_html)
-        emails.extend(raw_emails)
-        
-        # Method 2: Extract from visible text
-        if soup:
-            # Get all text from the page
-            visible_text = soup.get_text(" ", strip=True)
-            text_emails = extract_emails_from_text(visible_text)
-            emails.extend(text_emails)
-            
-            # Method 3: Check mailto links
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if href.startswith('mailto:'):
-                    email = href[7:]  # Remove 'mailto:'
-                    # Handle additional parameters in mailto links
-                    if '?' in email:
-                        email = email.split('?')[0]
-                    if email and email not in emails:
-                        emails.append(email)
-        
-        # Remove duplicates while preserving order
-        unique_emails = []
-        seen = set()
-        for email in emails:
-            if email not in seen:
-                seen.add(email)
-                unique_emails.append(email)
+        # Decode obfuscations and collect plain and mailto: addresses in one pass
+        unique_emails = extract_emails_from_html(html_text)
         
         logger.info(f"Extracted {len(unique_emails)} emails from {url}")
         return unique_emails
     
-    def find_contact_pages(self, base_url, soup):
+    def find_contact_pages(self, page_url, tree):
         """
-        Find potential contact pages from the given soup.
+        Find potential contact pages from the given parsed page.
         
         Args:
-            base_url (str): The base URL
-            soup (BeautifulSoup): The parsed HTML
+            page_url (str): The URL of the page, which relative links are resolved against
+            tree (HTMLParser): The parsed HTML
             
         Returns:
             list: List of contact page URLs sorted by relevance
         """
-        if not soup:
+        if not tree:
             return []
         
-        contact_links = []
-        
-        # Find all links
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            link_text = link.get_text(strip=True)
-            
-            # Skip empty, javascript, and anchor links
-            if not href or href.startswith(('javascript:', '#', 'tel:', 'mailto:')):
-                continue
-            
-            # Normalize the URL
-            full_url = normalize_url(href, base_url)
-            if not full_url:
-                continue
-            
-            # Calculate contact page likelihood score
-            score = is_likely_contact_page(full_url, link_text)
-            if score > 0:
-                contact_links.append((full_url, score))
-        
-        # Sort by score (highest first) and remove duplicates
-        contact_links.sort(key=lambda x: x[1], reverse=True)
-        
-        # Extract just the URLs, preserving order but removing duplicates
-        unique_urls = []
-        seen = set()
-        for url, _ in contact_links:
-            if url not in seen:
-                seen.add(url)
-                unique_urls.append(url)
+        links = ((link.attributes.get('href'), link.text(strip=True)) for link in tree.css('a[href]'))
+        unique_urls = rank_contact_links(links, page_url)
         
         logger.info(f"Found {len(unique_urls)} potential contact pages")
         return unique_urls
\ No newline at end of file
@@ -5,15 +5,20 @@ Main script for the Email Extractor.
 import asyncio
 import sys
 import signal
-import os
+import time
 from contextlib import asynccontextmanager
 
+import aiohttp
+
 from http_handler import HTTPHandler
-from playwright_handler import PlaywrightHandler
+from playwright_handler import get_handler, close_handler
 from crawler import Crawler
 from extractor import EmailExtractor
-from config import OUTPUT_FILE, GLOBAL_TIMEOUT
-from utils import logger
+from config import (
+    OUTPUT_FILE, VISITED_FILE, GLOBAL_TIMEOUT, HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST, DNS_CACHE_TTL
+)
+from utils import logger, FingerprintStore
 
 # Global variables for cleanup
 extractor = None
@@ -25,73 +30,118 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 @asynccontextmanager
-async def setup_extractor():
-    """Set up the email extractor components."""
+async def open_session():
+    """Open the pooled HTTP session shared by every extraction."""
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL
+        )
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+
+async def setup_extractor(session, processed_urls=None):
+    """
+    Set up the email extractor components for one website.
+    
+    The HTTP session and the browser are shared between websites; the
+    per-website state (visited pages, crawl progress) starts fresh.
+    
+    Args:
+        session (aiohttp.ClientSession): The pooled HTTP session
+        processed_urls: Optional FingerprintStore of already processed URLs
+        
+    Returns:
+        EmailExtractor: The extractor for the next website
+    """
     global extractor, playwright_handler
     
-    # Initialize HTTP handler
-    http_handler = HTTPHandler()
+    # Initialize HTTP handler with the pooled session
+    http_handler = HTTPHandler(session)
     
-    # Initialize Playwright handler
-    playwright_handler = PlaywrightHandler()
-    await playwright_handler.setup_browser()
+    # Reuse the already launched browser
+    playwright_handler = await get_handler()
+    playwright_handler.reset()
     
     # Initialize crawler
     crawler = Crawler(http_handler, playwright_handler)
     
     # Initialize extractor
-    extractor = EmailExtractor(http_handler, playwright_handler, crawler)
-    
-    try:
-        yield extractor
-    finally:
-        # Clean up resources
-        if playwright_handler:
-            await playwright_handler.cleanup()
+    extractor = EmailExtractor(http_handler, playwright_handler, crawler, processed_urls)
+    return extractor
 
-async def extract_emails_from_url(url):
+async def extract_emails_from_url(session, url, output, processed_urls=None):
     """
     Extract emails from a URL with a global timeout.
     
     Args:
+        session (aiohttp.ClientSession): The pooled HTTP session
         url (str): The URL to extract emails from
+        output: The open output file emails are appended to
+        processed_urls: Optional FingerprintStore of already processed URLs
     """
-    async with setup_extractor() as extractor:
+    try:
+        extractor = await setup_extractor(session, processed_urls)
+        
+        # Create a task with a global timeout
+        extraction_task = asyncio.create_task(extractor.extract_emails_from_url(url))
         try:
-            # Create a task with a global timeout
-            extraction_task = asyncio.create_task(extractor.extract_emails_from_url(url))
-            try:
-                emails = await asyncio.wait_for(extraction_task, timeout=GLOBAL_TIMEOUT)
+            emails = await asyncio.wait_for(extraction_task, timeout=GLOBAL_TIMEOUT)
+            
+            # Save emails to output file
+            if emails:
+                # Write the whole batch at once and flush so it survives an interrupt
+                output.write('\n'.join(emails) + '\n')
+                output.flush()
                 
-                # Save emails to output file
-                if emails:
-                    with open(OUTPUT_FILE, 'a') as f:
-                        for email in emails:
-                            f.write(f"{email}\n")
-                    
-                    logger.info(f"Saved {len(emails)} emails to {OUTPUT_FILE}")
-                else:
-                    logger.warning(f"No emails found for {url}")
-            except asyncio.TimeoutError:
-                logger.error(f"Global timeout reached for {url}")
-                return
-        except Exception as e:
-            logger.error(f"Error extracting emails from {url}: {str(e)}")
+                logger.info(f"Saved {len(emails)} emails to {OUTPUT_FILE}")
+            else:
+                logger.warning(f"No emails found for {url}")
+        except asyncio.TimeoutError:
+            logger.error(f"Global timeout reached for {url}")
+            return
+    except Exception as e:
+        logger.error(f"Error extracting emails from {url}: {str(e)}")
 
 async def main():
     """Main entry point for the Email Extractor."""
     # Set up signal handler for graceful exit
     signal.signal(signal.SIGINT, signal_handler)
     
-    # Create output file if it doesn't exist
-    if not os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE, 'w') as f:
-            pass
-    
     logger.info("Email Extractor started")
     logger.info(f"Emails will be saved to {OUTPUT_FILE}")
     
-    # Main loop
+    # Load the websites processed in earlier runs
+    processed_urls = FingerprintStore(VISITED_FILE)
+    if len(processed_urls):
+        logger.info(f"Loaded {len(processed_urls)} processed URLs from {VISITED_FILE}")
+    
+    # Launch the browser up front so the first website does not wait for it
+    await get_handler()
+    
+    try:
+        # Keep the HTTP session and output file open for the whole session
+        async with open_session() as session:
+            with open(OUTPUT_FILE, 'a', buffering=65536) as output:
+                await run_loop(session, output, processed_urls)
+    finally:
+        await close_handler()
+    
+    logger.info("Email Extractor finished")
+
+async def run_loop(session, output, processed_urls):
+    """
+    Prompt for URLs and extract emails from each until the user exits.
+    
+    Args:
+        session (aiohttp.ClientSession): The pooled HTTP session
+        output: The open output file emails are appended to
+        processed_urls: FingerprintStore of already processed URLs
+    """
     while True:
         try:
             # Get URL from user
@@ -106,13 +156,13 @@ async def main():
                 continue
             
             # Create a task with a global timeout
-            start_time = time.time()
+            start_time = time.monotonic()
             try:
                 # Extract emails with timeout protection
-                await extract_emails_from_url(url)
+                await extract_emails_from_url(session, url, output, processed_urls)
                 
                 # Log processing time
-                elapsed = time.time() - start_time
+                elapsed = time.monotonic() - start_time
                 logger.info(f"Processing completed in {elapsed:.2f} seconds")
             except asyncio.TimeoutError:
                 logger.error(f"Processing timed out after {GLOBAL_TIMEOUT} seconds")
@@ -123,8 +173,6 @@ async def main():
             break
         except Exception as e:
             logger.error(f"Error processing URL: {str(e)}")
-    
-    logger.info("Email Extractor finished")
 
 if __name__ == "__main__":
     # Run the main function
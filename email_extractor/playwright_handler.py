@@ -5,29 +5,87 @@ Playwright handler for the Email Extractor.
 import asyncio
 import re
 import time
+from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright, TimeoutError
-from bs4 import BeautifulSoup
 
 from config import (
     PLAYWRIGHT_TIMEOUT, HEADLESS, BROWSER_TYPE, 
-    SLOW_MO, ACCEPT_COOKIE_KEYWORDS, COOKIE_BANNER_TIMEOUT,
-    PAGE_NAVIGATION_TIMEOUT, CONTACT_PAGE_SEARCH_TIMEOUT
+    SLOW_MO, COOKIE_BANNER_TIMEOUT,
+    PAGE_NAVIGATION_TIMEOUT, CONTACT_PAGE_SEARCH_TIMEOUT, BROWSER_POOL_SIZE,
+    MAX_USES_PER_CONTEXT, BLOCKED_RESOURCE_TYPES
 )
 from utils import (
-    get_random_user_agent, extract_emails_from_text, 
-    normalize_url, is_likely_contact_page, decode_email_entities,
-    logger
+    get_random_user_agent, get_random_user_agents, extract_emails_from_html,
+    canonicalize_url, rank_contact_links,
+    url_fingerprint, ACCEPT_COOKIE_RE, logger
 )
 
+# Resource types aborted by the request interceptor
+BLOCKED_RESOURCES = frozenset(BLOCKED_RESOURCE_TYPES)
+
+# Buttons inside cookie consent containers, matched against the accept labels
+CONSENT_BUTTON_SELECTOR = ", ".join(
+    f"[{attr}*='{name}'] button:visible"
+    for name in ("cookie", "consent", "gdpr")
+    for attr in ("id", "class")
+)
+
+# Any other visible control that may carry an accept label
+ACCEPT_BUTTON_SELECTOR = "button:visible, a:visible, [role='button']:visible"
+
+# Collects [href, text] for every link on the page
+LINKS_SCRIPT = """() => Array.from(
+    document.querySelectorAll('a[href]'),
+    a => [a.getAttribute('href'), (a.textContent || '').trim()]
+)"""
+
+# Size of the serialized document, measured inside the page
+CONTENT_LENGTH_SCRIPT = "() => document.documentElement ? document.documentElement.outerHTML.length : 0"
+
+# Clicks up to 5 elements whose onclick handler mentions mail, then returns the
+# updated document, or null when the page has no such elements
+REVEAL_EMAILS_SCRIPT = """async () => {
+    const elements = Array.from(
+        document.querySelectorAll('[onclick*="mail"], [onclick*="email"]')
+    ).slice(0, 5);
+    if (!elements.length) {
+        return null;
+    }
+    for (const element of elements) {
+        try { element.click(); } catch (e) {}
+    }
+    await new Promise(resolve => setTimeout(resolve, 200));
+    return document.documentElement.outerHTML;
+}"""
+
 class PlaywrightHandler:
     """Handles browser automation using Playwright."""
     
     def __init__(self):
         """Initialize the Playwright handler."""
         self.browser = None
-        self.context = None
-        self.page = None
+        self._contexts = []
+        self._pool = None
+        self._uses = {}
         self.visited_urls = set()
+        self.loaded_urls = set()
+    
+    def reset(self):
+        """Forget visited pages so the shared handler can start a new website."""
+        self.visited_urls = set()
+        self.loaded_urls = set()
+    
+    def has_loaded(self, url):
+        """
+        Check whether a URL was loaded successfully in the browser.
+        
+        Args:
+            url (str): The URL to check
+            
+        Returns:
+            bool: True if the page was navigated to and its content read, False otherwise
+        """
+        return url_fingerprint(canonicalize_url(url)) in self.loaded_urls
     
     async def __aenter__(self):
         """Set up the browser when entering the context manager."""
@@ -57,22 +115,10 @@ class PlaywrightHandler:
                 slow_mo=SLOW_MO
             )
             
-            # Create a context with custom user agent
-            self.context = await self.browser.new_context(
-                user_agent=get_random_user_agent(),
-                viewport={'width': 1280, 'height': 800},
-                java_script_enabled=True,
-                ignore_https_errors=True
-            )
-            
-            # Set default timeout
-            self.context.set_default_timeout(PLAYWRIGHT_TIMEOUT * 1000)  # Convert to ms
-            
-            # Create a page
-            self.page = await self.context.new_page()
-            
-            # Set up event handlers
-            self.page.on("dialog", self._handle_dialog)
+            # Create a pool of contexts so several pages can load concurrently
+            self._pool = asyncio.Queue()
+            for user_agent in get_random_user_agents(BROWSER_POOL_SIZE):
+                self._pool.put_nowait(await self._new_context(user_agent))
             
             logger.info("Playwright browser setup complete")
             return True
@@ -82,16 +128,111 @@ class PlaywrightHandler:
             await self.cleanup()
             return False
     
+    async def _new_context(self, user_agent=None):
+        """
+        Create a browser context with a custom user agent.
+        
+        Args:
+            user_agent (str): The user agent to use, random if not given
+        """
+        context = await self.browser.new_context(
+            user_agent=user_agent or get_random_user_agent(),
+            viewport={'width': 1280, 'height': 800},
+            java_script_enabled=True,
+            ignore_https_errors=True
+        )
+        
+        # Set default timeout
+        context.set_default_timeout(PLAYWRIGHT_TIMEOUT * 1000)  # Convert to ms
+        
+        # Skip downloading resources that cannot contain emails
+        try:
+            await context.route("**/*", self._block_resources)
+        except Exception:
+            # Do not leak a half set up context
+            await context.close()
+            raise
+        
+        self._contexts.append(context)
+        self._uses[context] = 0
+        return context
+    
+    async def _recycle_context(self, context):
+        """
+        Replace a worn-out context with a fresh one from the same browser.
+        
+        Args:
+            context (BrowserContext): The context to close
+            
+        Returns:
+            BrowserContext: The new context
+        """
+        # Create the replacement first so a failure leaves the old context usable
+        new_context = await self._new_context()
+        
+        self._contexts.remove(context)
+        del self._uses[context]
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing context: {str(e)}")
+        
+        return new_context
+    
+    async def _block_resources(self, route):
+        """Abort requests for blocked resource types and let the rest through."""
+        if route.request.resource_type in BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    @asynccontextmanager
+    async def _acquire_page(self):
+        """
+        Borrow a context from the pool and open a fresh page in it.
+        
+        The page is closed and the context returned to the pool on exit.
+        Contexts that have loaded MAX_USES_PER_CONTEXT pages are replaced so
+        the browser's memory does not keep growing over long runs.
+        """
+        context = await self._pool.get()
+        page = None
+        try:
+            page = await context.new_page()
+            
+            # Set up event handlers
+            page.on("dialog", self._handle_dialog)
+            
+            yield page
+        finally:
+            if page:
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.debug(f"Error closing page: {str(e)}")
+            
+            # Always hand a context back so the pool never shrinks
+            self._uses[context] += 1
+            try:
+                if self._uses[context] >= MAX_USES_PER_CONTEXT:
+                    try:
+                        context = await self._recycle_context(context)
+                    except Exception as e:
+                        # Keep the old context; recycling is retried when it is next returned
+                        logger.error(f"Error recycling browser context: {str(e)}")
+            finally:
+                self._pool.put_nowait(context)
+    
     async def _handle_dialog(self, dialog):
         """Handle dialogs (alerts, confirms, prompts)."""
         logger.info(f"Dismissing dialog: {dialog.message}")
         await dialog.dismiss()
     
-    async def _handle_cookie_banners(self):
+    async def _handle_cookie_banners(self, page):
         """Attempt to handle cookie consent banners with a timeout."""
         try:
             # Set a timeout for cookie banner handling
-            cookie_task = asyncio.create_task(self._find_and_click_cookie_button())
+            cookie_task = asyncio.create_task(self._find_and_click_cookie_button(page))
             try:
                 await asyncio.wait_for(cookie_task, timeout=COOKIE_BANNER_TIMEOUT)
                 return True
@@ -102,69 +243,56 @@ class PlaywrightHandler:
             logger.warning(f"Error handling cookie banner: {str(e)}")
             return False
 
-    async def _find_and_click_cookie_button(self):
+    async def _find_and_click_cookie_button(self, page):
         """Find and click cookie consent buttons."""
-        for keyword in ACCEPT_COOKIE_KEYWORDS:
-            # Try different selector strategies
-            selectors = [
-                f"button:has-text('{keyword}')",
-                f"button:has-text('{keyword.upper()}')",
-                f"button:has-text('{keyword.capitalize()}')",
-                f"a:has-text('{keyword}')",
-                f"div:has-text('{keyword}'):visible",
-                f"[id*='cookie'] button",
-                f"[class*='cookie'] button",
-                f"[id*='consent'] button",
-                f"[class*='consent'] button",
-                f"[id*='gdpr'] button",
-                f"[class*='gdpr'] button"
-            ]
-            
-            for selector in selectors:
-                try:
-                    # Reduced timeout for selector waiting and added state option
-                    button = await self.page.wait_for_selector(
-                        selector, 
-                        timeout=1000,
-                        state="visible"
-                    )
-                    if button:
-                        try:
-                            await button.click()
-                            logger.info(f"Clicked cookie consent button: {selector}")
-                            await self.page.wait_for_timeout(500)  # Reduced wait time
-                            return True
-                        except Exception as e:
-                            logger.debug(f"Failed to click {selector}: {str(e)}")
-                            continue
-                except Exception:
-                    # Silently continue if selector not found
-                    continue
+        consent_button = page.locator(CONSENT_BUTTON_SELECTOR).filter(has_text=ACCEPT_COOKIE_RE)
+        accept_button = page.locator(ACCEPT_BUTTON_SELECTOR).filter(has_text=ACCEPT_COOKIE_RE)
         
-        return False
+        try:
+            # Prefer a button inside a consent container if one is already rendered,
+            # otherwise wait briefly for any accept control to appear
+            if await consent_button.count():
+                button = consent_button.first
+            else:
+                button = accept_button.first
+            
+            await button.click(timeout=1500)
+            logger.info("Clicked cookie consent button")
+            await page.wait_for_timeout(500)
+            return True
+        except TimeoutError:
+            return False
+        except Exception as e:
+            logger.debug(f"Failed to click cookie consent button: {str(e)}")
+            return False
     
-    async def navigate_to_url(self, url):
+    async def navigate_to_url(self, url, page):
         """
         Navigate to a URL using Playwright.
         
         Args:
             url (str): The URL to navigate to
+            page: The page to navigate, from _acquire_page
             
         Returns:
-            tuple: (success, html_content, soup)
+            tuple: (success, html_content)
         """
-        if url in self.visited_urls:
-            logger.debug(f"Skipping already visited URL: {url}")
-            return False, None, None
+        # Key on the canonical URL like the HTTP handler, so variants of a page dedup the same way.
+        # Only pages that failed to load are skipped: one the crawler loaded is loaded again so
+        # its emails can be read
+        fingerprint = url_fingerprint(canonicalize_url(url))
+        if fingerprint in self.visited_urls and fingerprint not in self.loaded_urls:
+            logger.debug(f"Skipping URL that already failed to load: {url}")
+            return False, None
         
-        self.visited_urls.add(url)
+        self.visited_urls.add(fingerprint)
         
         try:
             # Navigate to the URL
             logger.info(f"Navigating to URL with Playwright: {url}")
             try:
                 # Changed from networkidle to domcontentloaded for faster loading
-                response = await self.page.goto(
+                response = await page.goto(
                     url, 
                     wait_until="domcontentloaded", 
                     timeout=PAGE_NAVIGATION_TIMEOUT * 1000
@@ -176,36 +304,42 @@ class PlaywrightHandler:
             # Even if navigation times out, try to get content
             if not response:
                 try:
-                    # Check if we have any content
-                    html_content = await self.page.content()
-                    if not html_content or len(html_content) < 100:  # Very small content likely means error
+                    # Check if we have any content without copying the document out of the browser
+                    content_length = await page.evaluate(CONTENT_LENGTH_SCRIPT)
+                    if content_length < 100:  # Very small content likely means error
                         logger.warning(f"No usable content from {url}")
-                        return False, None, None
+                        return False, None
                 except:
                     logger.warning(f"Failed to get content from {url}")
-                    return False, None, None
+                    return False, None
             elif not response.ok:
                 logger.warning(f"Failed to navigate to {url}, status: {response.status}")
-                return False, None, None
+                return False, None
+            
+            # Wait briefly for the body to render instead of waiting for network idle
+            try:
+                await page.wait_for_function(
+                    "document.body && document.body.innerText.length > 0",
+                    timeout=2000
+                )
+            except TimeoutError:
+                pass
             
             # Handle cookie banners
-            await self._handle_cookie_banners()
+            await self._handle_cookie_banners(page)
             
             # Get the page content
             try:
-                html_content = await self.page.content()
-                
-                # Parse with BeautifulSoup
-                soup = BeautifulSoup(html_content, 'lxml')
-                
-                return True, html_content, soup
+                html_content = await page.content()
+                self.loaded_urls.add(fingerprint)
+                return True, html_content
             except Exception as e:
                 logger.error(f"Error getting page content: {str(e)}")
-                return False, None, None
+                return False, None
             
         except Exception as e:
             logger.error(f"Error navigating to {url} with Playwright: {str(e)}")
-            return False, None, None
+            return False, None
     
     async def extract_emails_from_page(self, url):
         """
@@ -217,154 +351,98 @@ class PlaywrightHandler:
         Returns:
             list: List of extracted email addresses
         """
+        if not self._pool:
+            return []
+        
         try:
-            # Create a task with timeout
-            extraction_task = asyncio.create_task(self._extract_emails_impl(url))
-            try:
-                return await asyncio.wait_for(extraction_task, timeout=PLAYWRIGHT_TIMEOUT)
-            except asyncio.TimeoutError:
-                logger.warning(f"Email extraction timed out for {url}")
-                return []
+            async with self._acquire_page() as page:
+                # Create a task with timeout
+                extraction_task = asyncio.create_task(self._extract_emails_impl(url, page))
+                try:
+                    return await asyncio.wait_for(extraction_task, timeout=PLAYWRIGHT_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Email extraction timed out for {url}")
+                    return []
         except Exception as e:
             logger.error(f"Error in extract_emails_from_page: {str(e)}")
             return []
+    
+    async def extract_emails_from_pages(self, urls):
+        """
+        Extract emails from several web pages concurrently, one pooled context each.
+        
+        Args:
+            urls (list): The URLs to extract emails from
+            
+        Returns:
+            list: One list of extracted email addresses per URL, in order
+        """
+        return await asyncio.gather(*[self.extract_emails_from_page(url) for url in urls])
 
-    async def _extract_emails_impl(self, url):
+    async def _extract_emails_impl(self, url, page):
         """Implementation of email extraction with proper error handling."""
-        success, html_content, soup = await self.navigate_to_url(url)
+        success, html_content = await self.navigate_to_url(url, page)
         if not success or not html_content:
             return []
         
-        emails = []
-        
-        # Method 1: Extract from raw HTML (catches obfuscated emails)
-        decoded_html = decode_email_entities(html_content)
-        raw_emails = extract_emails_from_text(decoded_html)
-        emails.extend(raw_emails)
-        
-        # Method 2: Extract from visible text
-        if soup:
-            # Get all text from the page
-            visible_text = soup.get_text(" ", strip=True)
-            text_emails = extract_emails_from_text(visible_text)
-            emails.extend(text_emails)
-            
-            # Method 3: Check mailto links
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if href.startswith('mailto:'):
-                    email = href[7:]  # Remove 'mailto:'
-                    # Handle additional parameters in mailto links
-                    if '?' in email:
-                        email = email.split('?')[0]
-                    if email and email not in emails:
-                        emails.append(email)
+        # Decode obfuscations and collect plain and mailto: addresses in one pass.
+        # The rendered HTML already contains everything the visible text does,
+        # including the onclick handlers that build mailto: links
+        emails = extract_emails_from_html(html_content)
         
-        # Method 4: Execute JavaScript to find emails that might be generated dynamically
-        try:
-            # Get all text content from the page using JavaScript
-            js_text = await self.page.evaluate('''
-                () => {
-                    return document.body.innerText;
-                }
-            ''')
-            js_emails = extract_emails_from_text(js_text)
-            emails.extend(js_emails)
-            
-            # Look for elements with onclick handlers that might reveal emails
-            # Limit the number of elements to check to avoid long processing
-            email_elements = await self.page.query_selector_all('[onclick*="mail"], [onclick*="email"]')
-            for i, element in enumerate(email_elements):
-                if i >= 5:  # Limit to 5 elements to avoid long processing
-                    break
-                try:
-                    await element.click()
-                    await self.page.wait_for_timeout(300)  # Reduced wait time
-                    
-                    # Get updated page content
-                    updated_html = await self.page.content()
-                    updated_soup = BeautifulSoup(updated_html, 'lxml')
-                    
-                    # Extract emails from the updated content
-                    updated_text = updated_soup.get_text(" ", strip=True)
-                    updated_emails = extract_emails_from_text(updated_text)
-                    emails.extend(updated_emails)
-                except:
-                    continue
-        except Exception as e:
-            logger.warning(f"Error executing JavaScript for email extraction: {str(e)}")
+        # Some handlers only write the address into the page when clicked;
+        # click them all inside the page and read the document back once
+        if not emails:
+            try:
+                revealed_html = await page.evaluate(REVEAL_EMAILS_SCRIPT)
+                if revealed_html:
+                    emails = extract_emails_from_html(revealed_html)
+            except Exception as e:
+                logger.warning(f"Error executing JavaScript for email extraction: {str(e)}")
         
         # Remove duplicates while preserving order
-        unique_emails = []
-        seen = set()
-        for email in emails:
-            if email not in seen:
-                seen.add(email)
-                unique_emails.append(email)
+        unique_emails = list(dict.fromkeys(emails))
         
         logger.info(f"Extracted {len(unique_emails)} emails from {url} using Playwright")
         return unique_emails
     
-    async def find_contact_pages(self, base_url):
+    async def find_contact_pages(self, url):
         """
-        Find potential contact pages from the current page with timeout protection.
+        Load a page and find potential contact pages on it with timeout protection.
         
         Args:
-            base_url (str): The base URL
+            url (str): The URL of the page to search, which relative links are resolved against
             
         Returns:
             list: List of contact page URLs sorted by relevance
         """
+        if not self._pool:
+            return []
+        
         try:
-            # Create a task with timeout
-            contact_task = asyncio.create_task(self._find_contact_pages_impl(base_url))
-            try:
-                return await asyncio.wait_for(contact_task, timeout=CONTACT_PAGE_SEARCH_TIMEOUT)
-            except asyncio.TimeoutError:
-                logger.warning(f"Contact page search timed out for {base_url}")
-                return []
+            async with self._acquire_page() as page:
+                success, _ = await self.navigate_to_url(url, page)
+                if not success:
+                    return []
+                
+                # Create a task with timeout
+                contact_task = asyncio.create_task(self._find_contact_pages_impl(url, page))
+                try:
+                    return await asyncio.wait_for(contact_task, timeout=CONTACT_PAGE_SEARCH_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Contact page search timed out for {url}")
+                    return []
         except Exception as e:
             logger.error(f"Error in find_contact_pages: {str(e)}")
             return []
     
-    async def _find_contact_pages_impl(self, base_url):
+    async def _find_contact_pages_impl(self, page_url, page):
         """Implementation of contact page finding with proper error handling."""
         try:
-            # Get all links from the page
-            links = await self.page.query_selector_all('a[href]')
-            
-            contact_links = []
-            for link in links:
-                try:
-                    href = await link.get_attribute('href')
-                    link_text = await link.text_content()
-                    
-                    # Skip empty, javascript, and anchor links
-                    if not href or href.startswith(('javascript:', '#', 'tel:', 'mailto:')):
-                        continue
-                    
-                    # Normalize the URL
-                    full_url = normalize_url(href, base_url)
-                    if not full_url:
-                        continue
-                    
-                    # Calculate contact page likelihood score
-                    score = is_likely_contact_page(full_url, link_text)
-                    if score > 0:
-                        contact_links.append((full_url, score))
-                except:
-                    continue
+            # Read every link's href and text in a single round trip to the browser
+            links = await page.evaluate(LINKS_SCRIPT)
             
-            # Sort by score (highest first) and remove duplicates
-            contact_links.sort(key=lambda x: x[1], reverse=True)
-            
-            # Extract just the URLs, preserving order but removing duplicates
-            unique_urls = []
-            seen = set()
-            for url, _ in contact_links:
-                if url not in seen:
-                    seen.add(url)
-                    unique_urls.append(url)
+            unique_urls = rank_contact_links(links, page_url)
             
             logger.info(f"Found {len(unique_urls)} potential contact pages using Playwright")
             return unique_urls
@@ -376,13 +454,11 @@ class PlaywrightHandler:
     async def cleanup(self):
         """Clean up Playwright resources."""
         try:
-            if self.page:
-                await self.page.close()
-                self.page = None
-            
-            if self.context:
-                await self.context.close()
-                self.context = None
+            for context in self._contexts:
+                await context.close()
+            self._contexts = []
+            self._uses = {}
+            self._pool = None
             
             if self.browser:
                 await self.browser.close()
@@ -393,4 +469,27 @@ class PlaywrightHandler:
             
             logger.info("Playwright resources cleaned up")
         except Exception as e:
-            logger.error(f"Error cleaning up Playwright resources: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error cleaning up Playwright resources: {str(e)}")
+
+# Shared handler so the browser is launched once per process, not once per website
+_HANDLER = None
+
+async def get_handler():
+    """
+    Return the process-wide Playwright handler, launching the browser on first use.
+    
+    Returns:
+        PlaywrightHandler: The shared handler with its context pool ready
+    """
+    global _HANDLER
+    if _HANDLER is None:
+        _HANDLER = PlaywrightHandler()
+        await _HANDLER.setup_browser()
+    return _HANDLER
+
+async def close_handler():
+    """Shut down the process-wide Playwright handler if it was started."""
+    global _HANDLER
+    if _HANDLER is not None:
+        await _HANDLER.cleanup()
+        _HANDLER = None
@@ -0,0 +1,49 @@
+"""
+Regression tests for the contact page crawler
+"""
+import asyncio
+import unittest
+
+from crawler import Crawler
+from utils import normalize_url
+
+
+class FakeHTTPHandler:
+    """Serves fixed pages and resolves their links like HTTPHandler does."""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+    
+    async def fetch_url(self, url):
+        self.fetched.append(url)
+        if url not in self.pages:
+            return None, None
+        return '<html></html>', url
+    
+    def find_contact_pages(self, page_url, tree):
+        return [normalize_url(href, page_url) for href in self.pages[tree]]
+
+
+class CrawlerTest(unittest.TestCase):
+    def test_sub_page_links_resolve_against_the_sub_page(self):
+        handler = FakeHTTPHandler({
+            'https://site.de/': ['/de/ueber-uns/index.html'],
+            'https://site.de/de/ueber-uns/index.html': ['kontakt.html'],
+        })
+        contact_pages = asyncio.run(Crawler(handler).find_contact_pages('https://site.de/'))
+        self.assertEqual(contact_pages, [
+            'https://site.de/de/ueber-uns/index.html',
+            'https://site.de/de/ueber-uns/kontakt.html',
+        ])
+    
+    def test_contact_pages_on_other_domains_are_skipped(self):
+        handler = FakeHTTPHandler({
+            'https://site.de/': ['https://social.example.org/site/contact', '/kontakt'],
+        })
+        contact_pages = asyncio.run(Crawler(handler).find_contact_pages('https://site.de/'))
+        self.assertEqual(contact_pages, ['https://site.de/kontakt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
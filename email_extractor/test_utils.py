@@ -0,0 +1,92 @@
+"""
+Regression tests for the email scanning helpers in utils
+"""
+import unittest
+
+from utils import (
+    EMAIL_RE, extract_emails_from_text, extract_emails_from_html, _iter_windowed_matches,
+    rank_contact_links
+)
+
+
+class ExtractEmailsTest(unittest.TestCase):
+    def test_windowed_hit_that_is_not_an_address_in_full(self):
+        # Within the 256-character window the domain ends at '.cc'; the full text continues with '9'
+        text = 'contact a@' + 'b' * 252 + '.cc' + '9 end'
+        self.assertEqual(extract_emails_from_text(text), [])
+    
+    def test_scan_continues_after_a_dropped_hit(self):
+        html = '<p>contact a@' + 'b' * 252 + '.cc9</p><p>real@site.org</p>'
+        self.assertEqual(extract_emails_from_html(html), ['real@site.org'])
+    
+    def test_window_does_not_reach_into_previous_match(self):
+        # The second '@' window starts right after the first '@', inside the first match
+        text = 'x@' + 'c' * 61 + '.de@xyz.com'
+        self.assertEqual(extract_emails_from_text(text), ['x@' + 'c' * 61 + '.de'])
+    
+    def test_long_local_part_is_not_cut_short(self):
+        # A window starting 64 characters before the '@' lands inside the local part
+        text = 'see ' + 'x' * 70 + '@b.cd@e.fg'
+        self.assertEqual(extract_emails_from_text(text), ['x' * 70 + '@b.cd'])
+    
+    def test_long_domain_is_not_cut_short(self):
+        text = 'mail a@' + 'b' * 300 + '.com now'
+        self.assertEqual(extract_emails_from_text(text), ['a@' + 'b' * 300 + '.com'])
+    
+    def test_windows_match_a_plain_scan(self):
+        filler = 'lorem ipsum dolor sit amet ' * 40
+        for text in (
+            filler.join('p%d@shop.de' % i for i in range(50)),
+            filler + 'a' * 100 + '@' + 'b' * 300 + '.de@c.org ' + filler,
+            filler + 'x@' + 'c' * 300 + '.uk9@d.io' + filler,
+        ):
+            self.assertEqual(
+                [m.span() for m in _iter_windowed_matches(text)],
+                [m.span() for m in EMAIL_RE.finditer(text)]
+            )
+    
+    def test_dense_at_signs(self):
+        # Text full of '@'s takes the plain scan instead of one window per '@'
+        for text in (
+            '@media (max-width: 600px) { .a { color: red } } ' * 5000,
+            'follow @brand and @user_1 or mail team@brand.io ' * 5000,
+            'abcdef@ghijkl ' * 20000,
+            'a@' * 131072,
+            '@' * 262144,
+        ):
+            expected = list(dict.fromkeys(m.group(0).lower() for m in EMAIL_RE.finditer(text)))
+            self.assertEqual(extract_emails_from_text(text), expected)
+            self.assertEqual(
+                [m.span() for m in _iter_windowed_matches(text[:20000])],
+                [m.span() for m in EMAIL_RE.finditer(text[:20000])]
+            )
+    
+    def test_percent_encoded_mailto_targets(self):
+        # Only the mailto: pass sees these - the text has no '@' at all
+        html = (
+            '<a href="MailTo:Sales%40Site.org?subject=Hi%20there">a</a>'
+            '<a href="mailto:you%40example.com">b</a>'
+            '<a href="mailto:bogus%40">c</a>'
+        )
+        self.assertEqual(extract_emails_from_text(html), [])
+        self.assertEqual(extract_emails_from_html(html), ['sales@site.org'])
+
+
+
+class RankContactLinksTest(unittest.TestCase):
+    def test_links_are_resolved_scored_and_deduplicated(self):
+        links = [
+            ('produkte.html', 'Produkte'),
+            ('kontakt.html', 'Kontakt'),
+            ('/impressum', 'Impressum'),
+            ('kontakt.html#form', 'Schreiben Sie uns'),
+            ('mailto:info@site.de', 'Kontakt'),
+            ('', 'Kontakt'),
+        ]
+        ranked = rank_contact_links(links, 'https://site.de/de/firma/index.html')
+        # The fragment variant folds into the same page; mailto: and empty links are skipped
+        self.assertEqual(ranked, ['https://site.de/de/firma/kontakt.html', 'https://site.de/impressum'])
+
+
+if __name__ == '__main__':
+    unittest.main()
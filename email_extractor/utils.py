@@ -2,12 +2,19 @@
 Utility functions for the Email Extractor.
 """
 
+import os
 import re
 import logging
 import random
+import hashlib
+from functools import lru_cache
 import tldextract
-from urllib.parse import urljoin, urlparse
-from config import USER_AGENTS
+from urllib.parse import urljoin, urlparse as _urlparse, parse_qsl, urlencode, unquote
+from config import USER_AGENTS, ACCEPT_COOKIE_KEYWORDS
+
+# Cached URL parser - the same URLs are parsed repeatedly during a crawl,
+# and ParseResult is an immutable tuple, so results are safe to share
+urlparse = lru_cache(maxsize=8192)(_urlparse)
 
 # Set up logging
 logging.basicConfig(
@@ -18,6 +25,58 @@ logger = logging.getLogger('email_extractor')
 
 # Email regex pattern - comprehensive pattern to catch various email formats
 EMAIL_REGEX = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+# Scanner variant that refuses to cut an address short, so every match is
+# already a complete, valid address (a trailing sentence period is allowed).
+# The lookbehind also means a match can only start at the beginning of a run
+# of address characters, so long runs without an '@' are not rescanned from
+# every position inside them
+EMAIL_RE = re.compile(r'(?<![a-zA-Z0-9._%+-])' + EMAIL_REGEX + r'(?![a-zA-Z0-9-])')
+VALID_EMAIL_RE = re.compile(r'\A' + EMAIL_REGEX + r'\Z')
+
+# Address part of mailto: links with a percent-encoded '@', which the plain
+# text scan cannot see
+MAILTO_RE = re.compile(r'mailto:([^"\'?\s>&]*%40[^"\'?\s>&]*)', re.IGNORECASE)
+
+# Named HTML entities commonly used to hide email characters
+EMAIL_ENTITIES = {
+    '&amp;': '&',
+    '&lt;': '<',
+    '&gt;': '>',
+    '&period;': '.',
+    '&commat;': '@',
+    '&hyphen;': '-',
+    '&lowbar;': '_',
+}
+
+# Numeric entities, named entities and "[at]"/"(dot)" style obfuscations in one alternation
+ENTITY_RE = re.compile(
+    r'&#(\d+);|&#x([0-9a-fA-F]+);|'
+    + '|'.join(re.escape(entity) for entity in EMAIL_ENTITIES)
+    + r'|\s*[\[\(\{]\s*(at|dot)\s*[\]\)\}]\s*',
+    re.IGNORECASE
+)
+
+# Placeholder addresses that appear in templates and form hints
+INVALID_EMAIL_DOMAINS = frozenset({
+    'example.com', 'sample.com', 'domain.com', 'email.com', 'test.com', 'yourcompany.com',
+})
+
+# Common contact page patterns in URLs, combined into a single alternation
+CONTACT_URL_PATTERNS = [
+    r'/contact', r'/kontakt', r'/contacto', r'/contatti', r'/contact-us',
+    r'/about', r'/about-us', r'/ueber-uns', r'/impressum', r'/imprint',
+    r'/get-in-touch', r'/reach-us', r'/reach-out', r'/connect'
+]
+CONTACT_RE = re.compile('|'.join(CONTACT_URL_PATTERNS), re.IGNORECASE)
+CONTACT_BOOST_RE = re.compile(r'/(?:contact|kontakt)', re.IGNORECASE)
+
+# Cookie consent accept labels, matched as whole words in a single pass
+ACCEPT_COOKIE_RE = re.compile(
+    r'\b(?:' + '|'.join(
+        re.escape(keyword) for keyword in sorted(ACCEPT_COOKIE_KEYWORDS, key=len, reverse=True)
+    ) + r')\b',
+    re.IGNORECASE
+)
 
 # Contact page keywords in multiple languages
 CONTACT_KEYWORDS = {
@@ -71,34 +130,98 @@ CONTACT_KEYWORDS = {
     'ga': ['teagmháil', 'teagmhail', 'fúinn', 'fuinn', 'foireann', 'eolas dlíthiúil', 'eolas dlithiuil'],
 }
 
+# Query parameters that only track the visitor and never change page content
+TRACKING_QUERY_PARAMS = {'ref', 'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid'}
+TRACKING_PARAM_RE = re.compile(
+    r'utm_|(?:' + '|'.join(sorted(TRACKING_QUERY_PARAMS)) + r')\Z',
+    re.IGNORECASE
+)
+
+# Size in bytes of URL fingerprints
+FINGERPRINT_SIZE = 16
+
+# Longest local part an address can have (RFC 5321), how far before each '@'
+# a scan window starts unless the local part turns out to be longer
+MAX_EMAIL_LOCAL_LENGTH = 64
+# At or above one '@' per this many characters the windows would cover most
+# of the text, so a single plain scan is cheaper
+EMAIL_WINDOW_MIN_SPACING = 256
+
+# Characters of a local part, the text up to the last character before a run
+# of them, and a run of domain characters
+EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+LOCAL_RUN_START_RE = re.compile(r'.*[^a-zA-Z0-9._%+-]', re.DOTALL)
+DOMAIN_RUN_RE = re.compile(r'[a-zA-Z0-9.-]*')
+
+# Large documents are decoded and scanned in chunks of about this many characters
+SCAN_CHUNK_SIZE = 256 * 1024
+
+# Offline extractor built once from the public suffix list snapshot bundled
+# with tldextract, so domain lookups never wait on a suffix list download
+TLD_EXTRACTOR = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+# Private generator for user agent rotation, independent of the global random state
+_user_agent_random = random.Random()
+
+# Default ports that can be dropped from the netloc
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
 # Flatten the contact keywords for easier searching
 ALL_CONTACT_KEYWORDS = set()
 for lang_keywords in CONTACT_KEYWORDS.values():
     ALL_CONTACT_KEYWORDS.update(lang_keywords)
 
+# Case-insensitive alternations for keywords anywhere in a URL or link text and
+# for keywords starting a path segment, so callers never lowercase their input.
+# Longest keywords come first so the most specific one wins wherever a match starts
+CONTACT_KEYWORDS_LOWER = frozenset(keyword.lower() for keyword in ALL_CONTACT_KEYWORDS)
+_CONTACT_KEYWORD_ALTERNATION = '|'.join(
+    re.escape(keyword) for keyword in sorted(CONTACT_KEYWORDS_LOWER, key=lambda k: (-len(k), k))
+)
+CONTACT_KEYWORD_RE = re.compile(_CONTACT_KEYWORD_ALTERNATION, re.IGNORECASE)
+CONTACT_PATH_KEYWORD_RE = re.compile('/(?:' + _CONTACT_KEYWORD_ALTERNATION + ')', re.IGNORECASE)
+
+# Cheap pre-filter: a link can only score if its href or text contains one of these
+CONTACT_HINT_RE = re.compile(
+    '|'.join(re.escape(keyword) for keyword in ALL_CONTACT_KEYWORDS)
+    + '|' + '|'.join(pattern.lstrip('/') for pattern in CONTACT_URL_PATTERNS),
+    re.IGNORECASE
+)
+
 def get_random_user_agent():
     """Return a random user agent from the configured list."""
-    return random.choice(USER_AGENTS)
+    return USER_AGENTS[_user_agent_random.randrange(len(USER_AGENTS))]
+
+def get_random_user_agents(n):
+    """Return n random user agents from the configured list in a single draw."""
+    return _user_agent_random.choices(USER_AGENTS, k=n)
+
+def has_contact_hint(href, link_text=None):
+    """Check if a raw link could score as a contact page before normalizing it."""
+    return bool(CONTACT_HINT_RE.search(href) or (link_text and CONTACT_HINT_RE.search(link_text)))
 
 def is_valid_url(url):
     """Check if a URL is valid."""
+    if not isinstance(url, str):
+        return False
+    
     try:
         result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except:
+    except ValueError:
+        # Raised for malformed netlocs such as an unclosed IPv6 bracket
         return False
+    return bool(result.scheme and result.netloc)
 
+@lru_cache(maxsize=65536)
 def normalize_url(url, base_url=None):
     """Normalize a URL by handling relative paths and removing fragments."""
     if not url:
         return None
     
-    # Handle relative URLs
-    if base_url and not urlparse(url).netloc:
-        url = urljoin(base_url, url)
-    
-    # Parse the URL
+    # Parse the URL, re-parsing only when a relative URL had to be joined
     parsed = urlparse(url)
+    if base_url and not parsed.netloc:
+        parsed = urlparse(urljoin(base_url, url))
     
     # Reconstruct the URL without fragments
     normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
@@ -107,63 +230,143 @@ def normalize_url(url, base_url=None):
     
     return normalized
 
+def canonicalize_url(url):
+    """
+    Canonicalize a URL so that trivially different forms dedup to one key.
+    
+    Lowercases the scheme and host, drops default ports, the fragment and
+    tracking query parameters, sorts the remaining parameters and strips
+    the trailing slash from any path other than the root.
+    """
+    if not url:
+        return None
+    
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    
+    # Drop the port if it is the default one for the scheme
+    host, _, port = netloc.rpartition(':')
+    if host and port == DEFAULT_PORTS.get(scheme):
+        netloc = host
+    
+    # Strip the trailing slash except for the root path
+    path = parsed.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    
+    # Remove tracking parameters and sort the rest
+    params = [
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(key)
+    ]
+    params.sort()
+    
+    canonical = f"{scheme}://{netloc}{path}"
+    if params:
+        canonical += f"?{urlencode(params)}"
+    
+    return canonical
+
+def url_fingerprint(url):
+    """
+    Return a fixed-size 16-byte fingerprint of a URL.
+    
+    Used as the key of visited-URL sets so membership tests hash a short
+    digest instead of the full URL string.
+    """
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=FINGERPRINT_SIZE).digest()
+
+class FingerprintStore:
+    """Append-only on-disk set of URL fingerprints that persists between runs."""
+    
+    def __init__(self, path):
+        """
+        Load previously stored fingerprints.
+        
+        Args:
+            path (str): The file the fingerprints are stored in
+        """
+        self.path = path
+        self._fingerprints = set()
+        
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self._fingerprints.update(
+                data[i:i + FINGERPRINT_SIZE]
+                for i in range(0, len(data) - FINGERPRINT_SIZE + 1, FINGERPRINT_SIZE)
+            )
+    
+    def __contains__(self, url):
+        return url_fingerprint(canonicalize_url(url)) in self._fingerprints
+    
+    def __len__(self):
+        return len(self._fingerprints)
+    
+    def add(self, url):
+        """Record a URL, appending its fingerprint to the file if it is new."""
+        fingerprint = url_fingerprint(canonicalize_url(url))
+        if fingerprint in self._fingerprints:
+            return
+        
+        self._fingerprints.add(fingerprint)
+        with open(self.path, 'ab') as f:
+            f.write(fingerprint)
+
+@lru_cache(maxsize=65536)
+def _get_host_domain(host):
+    """Look up the registered domain of a host in the public suffix list."""
+    extracted = TLD_EXTRACTOR(host)
+    return f"{extracted.domain}.{extracted.suffix}"
+
 def get_domain(url):
     """Extract the domain from a URL."""
-    extracted = tldextract.extract(url)
-    return f"{extracted.domain}.{extracted.suffix}"
+    # Cache on the host so every page of a site shares one suffix list lookup
+    return _get_host_domain(urlparse(url).netloc.lower() or url)
+
+def _bare_netloc(url):
+    """Return the lowercased netloc of a URL without a leading 'www.'."""
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
 
 def is_same_domain(url1, url2):
     """Check if two URLs belong to the same domain."""
+    # Identical hosts (ignoring www.) always share a domain - no suffix list lookup needed
+    netloc1 = _bare_netloc(url1)
+    if netloc1 and netloc1 == _bare_netloc(url2):
+        return True
     return get_domain(url1) == get_domain(url2)
 
+@lru_cache(maxsize=65536)
 def is_likely_contact_page(url, link_text=None):
     """
     Determine if a URL is likely to be a contact page based on its URL and link text.
     Returns a score from 0-10 indicating likelihood (10 being highest).
     """
     score = 0
-    url_lower = url.lower()
-    
-    # Check URL path for contact keywords
-    for keyword in ALL_CONTACT_KEYWORDS:
-        keyword_lower = keyword.lower()
-        # Exact match in path gets higher score
-        if f"/{keyword_lower}" in url_lower or f"/{keyword_lower}/" in url_lower:
-            score += 7
-            break
-        # Partial match in URL
-        elif keyword_lower in url_lower:
-            score += 5
-            break
+    
+    # Check URL path for contact keywords - a match right after a slash scores higher
+    if CONTACT_PATH_KEYWORD_RE.search(url):
+        score += 7
+    elif CONTACT_KEYWORD_RE.search(url):
+        score += 5
     
     # If link text is provided, check it for contact keywords
     if link_text:
-        link_text_lower = link_text.lower()
-        for keyword in ALL_CONTACT_KEYWORDS:
-            keyword_lower = keyword.lower()
-            # Exact match in link text gets higher score
-            if link_text_lower == keyword_lower:
-                score += 8
-                break
-            # Partial match in link text
-            elif keyword_lower in link_text_lower:
-                score += 5
-                break
+        # Exact match in link text gets higher score
+        if CONTACT_KEYWORD_RE.fullmatch(link_text):
+            score += 8
+        # Partial match in link text
+        elif CONTACT_KEYWORD_RE.search(link_text):
+            score += 5
     
     # Check for common contact page patterns in URL
-    contact_patterns = [
-        r'/contact', r'/kontakt', r'/contacto', r'/contatti', r'/contact-us',
-        r'/about', r'/about-us', r'/ueber-uns', r'/impressum', r'/imprint',
-        r'/get-in-touch', r'/reach-us', r'/reach-out', r'/connect'
-    ]
-    
-    for pattern in contact_patterns:
-        if re.search(pattern, url_lower):
-            score += 3
-            break
+    if CONTACT_RE.search(url):
+        score += 3
     
     # Boost score for URLs with 'contact' or equivalent in the path
-    if '/contact' in url_lower or '/kontakt' in url_lower:
+    if CONTACT_BOOST_RE.search(url):
         score += 2
     
     # Penalize very long URLs (likely not contact pages)
@@ -172,71 +375,172 @@ def is_likely_contact_page(url, link_text=None):
     
     return min(score, 10)  # Cap at 10
 
+def rank_contact_links(links, page_url):
+    """
+    Rank a page's links by how likely they lead to a contact page.
+    
+    Args:
+        links (iterable): (href, link_text) pairs as they appear on the page
+        page_url (str): The URL of the page, which relative links are resolved against
+        
+    Returns:
+        list: Contact page URLs sorted by relevance, without duplicates
+    """
+    contact_urls = []
+    scores = []
+    for href, link_text in links:
+        # Skip empty, javascript, and anchor links
+        if not href or href.startswith(('javascript:', '#', 'tel:', 'mailto:', 'data:', 'blob:')):
+            continue
+        
+        # Skip links that cannot score before paying for normalization
+        if not has_contact_hint(href, link_text):
+            continue
+        
+        # Normalize the URL
+        full_url = normalize_url(href, page_url)
+        if not full_url:
+            continue
+        
+        # Calculate contact page likelihood score
+        score = is_likely_contact_page(full_url, link_text)
+        if score > 0:
+            contact_urls.append(full_url)
+            scores.append(score)
+    
+    # Sort by score (highest first) and remove duplicates
+    order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    
+    # Extract just the URLs, preserving order but removing duplicates
+    return list(dict.fromkeys(contact_urls[i] for i in order))
+
+def _iter_windowed_matches(text):
+    """
+    Yield the matches EMAIL_RE.finditer(text) would, scanning only around each '@'.
+    
+    A window runs from the start of the local part before an '@' to the end
+    of the domain characters after it, so the regex sees the same text at
+    both edges as it would in a plain scan. Overlapping windows are merged
+    into one span so no text is scanned twice.
+    """
+    floor = 0
+    at = text.find('@')
+    while at != -1:
+        # Local parts are rarely longer than the RFC limit; only look further
+        # back when the text there is still part of one
+        start = max(floor, at - MAX_EMAIL_LOCAL_LENGTH)
+        if start > floor and text[start - 1] in EMAIL_LOCAL_CHARS:
+            run = LOCAL_RUN_START_RE.match(text, floor, start)
+            start = run.end() if run else floor
+        
+        # Extend the span over every '@' whose window overlaps it
+        end = DOMAIN_RUN_RE.match(text, at + 1).end()
+        at = text.find('@', end)
+        while at != -1 and at - MAX_EMAIL_LOCAL_LENGTH <= end:
+            end = DOMAIN_RUN_RE.match(text, at + 1).end()
+            at = text.find('@', end)
+        
+        floor = start
+        for match in EMAIL_RE.finditer(text, start, end):
+            floor = match.end()
+            yield match
+
 def extract_emails_from_text(text):
     """Extract email addresses from text using regex."""
     if not text:
         return []
     
-    # Find all email matches
-    emails = re.findall(EMAIL_REGEX, text)
+    at_count = text.count('@')
+    if not at_count:
+        return []
+    
+    # Only run the regex around each '@' unless they are too dense for that to pay off
+    if at_count * EMAIL_WINDOW_MIN_SPACING >= len(text):
+        matches = EMAIL_RE.finditer(text)
+    else:
+        matches = _iter_windowed_matches(text)
     
-    # Normalize and deduplicate
+    # Normalize and deduplicate matches as they are found; rejected
+    # addresses are remembered too so repeats are not checked again
     normalized_emails = []
     seen = set()
-    
-    for email in emails:
-        email = email.lower().strip()
-        if email not in seen and is_valid_email(email):
+    for match in matches:
+        email = match.group(0).lower()
+        if email not in seen:
             seen.add(email)
-            normalized_emails.append(email)
+            # Matches satisfy the address pattern by construction - only placeholders remain to reject
+            if email.rsplit('@', 1)[1] not in INVALID_EMAIL_DOMAINS:
+                normalized_emails.append(email)
     
     return normalized_emails
 
 def is_valid_email(email):
     """Validate an email address."""
-    # Basic validation
-    if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+    # Basic validation, then reject common placeholder domains
+    if not VALID_EMAIL_RE.match(email):
         return False
+    return email.rsplit('@', 1)[1].lower() not in INVALID_EMAIL_DOMAINS
+
+def _iter_html_chunks(html, size=SCAN_CHUNK_SIZE):
+    """
+    Split HTML into chunks of roughly the given size.
     
-    # Check for common invalid patterns
-    invalid_patterns = [
-        r'@example\.com$',
-        r'@sample\.com$',
-        r'@domain\.com$',
-        r'@email\.com$',
-        r'@test\.com$',
-        r'@yourcompany\.com$',
-    ]
+    Chunks are only cut right before a '<', which can appear neither inside
+    an email address nor inside an entity, so no match straddles two chunks.
+    """
+    start = 0
+    while len(html) - start > size:
+        cut = html.rfind('<', start + 1, start + size)
+        if cut == -1:
+            cut = html.find('<', start + size)
+            if cut == -1:
+                break
+        yield html[start:cut]
+        start = cut
+    yield html[start:]
+
+def extract_emails_from_html(html):
+    """
+    Extract email addresses from raw HTML.
     
-    for pattern in invalid_patterns:
-        if re.search(pattern, email, re.IGNORECASE):
-            return False
+    Decodes entity-encoded and bracket-obfuscated characters in one pass,
+    then collects plain-text and percent-encoded mailto: addresses from the
+    result. Large
+    documents are processed chunk by chunk so only one decoded chunk is
+    held in memory at a time.
+    """
+    if not html:
+        return []
+    
+    emails = {}
+    for chunk in _iter_html_chunks(html):
+        decoded_chunk = decode_email_entities(chunk)
+        emails.update(dict.fromkeys(extract_emails_from_text(decoded_chunk)))
+        
+        # Plain mailto: targets are already found by the text scan; only decode
+        # percent-encoded ones, which most pages do not have
+        if '%40' in decoded_chunk:
+            for target in MAILTO_RE.findall(decoded_chunk):
+                email = unquote(target).lower()
+                if is_valid_email(email):
+                    emails.setdefault(email)
     
-    return True
+    return list(emails)
+
+def _replace_entity(match):
+    """Return the character hidden behind a single entity or obfuscation match."""
+    decimal, hexadecimal, word = match.groups()
+    try:
+        if decimal:
+            return chr(int(decimal))
+        if hexadecimal:
+            return chr(int(hexadecimal, 16))
+    except (ValueError, OverflowError):
+        return match.group(0)
+    if word:
+        return '@' if word.lower() == 'at' else '.'
+    return EMAIL_ENTITIES[match.group(0).lower()]
 
 def decode_email_entities(text):
-    """Decode HTML entities in email addresses."""
-    # Common HTML entity replacements
-    entities = {
-        '&amp;': '&',
-        '&lt;': '<',
-        '&gt;': '>',
-        '&#64;': '@',
-        '&#46;': '.',
-        '&#45;': '-',
-        '&#95;': '_',
-        '&period;': '.',
-        '&commat;': '@',
-        '&hyphen;': '-',
-        '&lowbar;': '_',
-    }
-    
-    # Replace entities
-    for entity, char in entities.items():
-        text = text.replace(entity, char)
-    
-    # Handle numeric entities
-    text = re.sub(r'&#(\d+);', lambda m: chr(int(m.group(1))), text)
-    text = re.sub(r'&#x([0-9a-fA-F]+);', lambda m: chr(int(m.group(1), 16)), text)
-    
-    return text
\ No newline at end of file
+    """Decode HTML entities and [at]/[dot] obfuscations in a single pass."""
+    return ENTITY_RE.sub(_replace_entity, text)